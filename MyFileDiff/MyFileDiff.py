@@ -1,11 +1,608 @@
 """MyFileDiff - A tool to display side-by-side file differences with GUI."""
 
+import os
 import sys
-import difflib
+import mmap
+import bisect
+import itertools
+from array import array
+import filecmp
+import functools
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
+from tkinter import font as tkfont
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional, Sequence
+
+# Files above this size are memory mapped and decoded in chunks of
+# DECODE_CHUNK_SIZE bytes; smaller ones are read in one go
+LARGE_FILE_SIZE = 4 * 1024 * 1024
+DECODE_CHUNK_SIZE = 1024 * 1024
+
+# The GUI keeps at most this many rows in each text widget and moves the
+# window once the view comes within RENDER_MARGIN_ROWS of one of its edges
+RENDER_WINDOW_ROWS = 2000
+RENDER_MARGIN_ROWS = 200
+
+# Number of diff results the GUI keeps for files compared again unchanged
+OPCODE_CACHE_SIZE = 10
+
+# Number of CLI rows joined into each write to stdout
+WRITE_BATCH_ROWS = 4096
+
+# Width in pixels of the colored strip drawn beside each text widget
+GUTTER_WIDTH = 8
+
+# Largest edit distance the Myers kernel searches before giving up; its
+# trace needs about MYERS_MAX_EDITS ** 2 * 2 bytes
+MYERS_MAX_EDITS = 4000
+
+# Importing Numba takes longer than SequenceMatcher needs for regions
+# smaller than this (lines in both files), so they never load the kernel
+MYERS_MIN_LINES = 100000
+
+# diff-match-patch's pure-Python bisect slows down quadratically as
+# regions grow apart; regions with more lines than this (in both files)
+# go to SequenceMatcher instead
+DMP_MAX_LINES = 200
+
+# Differing regions longer than this (lines in both files) are split at
+# unique anchor lines; the pieces go to a process pool only if this many
+# lines lie outside the largest piece, as the pool can do no better than
+# diffing that piece and smaller totals diff faster than workers start
+PARALLEL_MIN_LINES = 20000
+
+try:
+    from cdifflib import CSequenceMatcher as _SequenceMatcher
+except ImportError:  # Optional C implementation; same API as difflib's
+    from difflib import SequenceMatcher as _SequenceMatcher
+
+try:
+    from diff_match_patch import diff_match_patch
+except ImportError:  # Optional accelerator; difflib is used when missing
+    diff_match_patch = None
+
+# numpy, once imported by _load_myers_jit
+np = None
+
+# Opcode tags in the order of the Myers kernel's tag codes
+_MYERS_TAGS = ('equal', 'delete', 'insert', 'replace')
+
+
+def _myers_kernel(a, b, max_d):
+    """Myers' O((N+M)D) diff of two int32 arrays of line IDs.
+
+    Written for Numba's nopython mode; see _myers_opcodes.
+
+    Args:
+        a: Line IDs from first file
+        b: Line IDs from second file
+        max_d: Largest edit distance to search
+
+    Returns:
+        Tuple of an int32 array of (tag_code, i1, i2, j1, j2) rows and a
+        flag that is False if the edit distance exceeds max_d
+    """
+    n = a.shape[0]
+    m = b.shape[0]
+    offset = max_d + 1
+    v = np.zeros(2 * max_d + 3, dtype=np.int32)
+    # Row d of the trace starts at d * (d + 1) // 2 and holds the furthest
+    # x reached on diagonals k = -d, -d + 2, ..., d
+    trace = np.empty((max_d + 1) * (max_d + 2) // 2, dtype=np.int32)
+
+    found = -1
+    for d in range(max_d + 1):
+        row = d * (d + 1) // 2
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            trace[row + (k + d) // 2] = x
+            if x >= n and y >= m:
+                found = d
+                break
+        if found >= 0:
+            break
+
+    if found < 0:
+        return np.empty((0, 5), dtype=np.int32), False
+
+    # Walk the trace back from the end, collecting segments in reverse
+    segments = np.empty((2 * found + 1, 5), dtype=np.int32)
+    count = 0
+    x = n
+    y = m
+    for d in range(found, 0, -1):
+        k = x - y
+        prev_row = (d - 1) * d // 2
+        down = k == -d or (k != d and trace[prev_row + (k + d - 2) // 2] < trace[prev_row + (k + d) // 2])
+        prev_k = k + 1 if down else k - 1
+        prev_x = trace[prev_row + (prev_k + d - 1) // 2]
+        prev_y = prev_x - prev_k
+        mid_x = prev_x if down else prev_x + 1
+        mid_y = mid_x - k
+
+        if x > mid_x:
+            segments[count, 0] = 0
+            segments[count, 1] = mid_x
+            segments[count, 2] = x
+            segments[count, 3] = mid_y
+            segments[count, 4] = y
+            count += 1
+
+        segments[count, 0] = 2 if down else 1
+        segments[count, 1] = prev_x
+        segments[count, 2] = mid_x
+        segments[count, 3] = prev_y
+        segments[count, 4] = mid_y
+        count += 1
+
+        x = prev_x
+        y = prev_y
+
+    if x > 0:
+        segments[count, 0] = 0
+        segments[count, 1] = 0
+        segments[count, 2] = x
+        segments[count, 3] = 0
+        segments[count, 4] = y
+        count += 1
+
+    # Emit in forward order, merging each run of edits into one opcode
+    ops = np.empty((count, 5), dtype=np.int32)
+    size = 0
+    for s in range(count - 1, -1, -1):
+        tag = segments[s, 0]
+        if size > 0 and tag != 0 and ops[size - 1, 0] != 0:
+            if tag != ops[size - 1, 0]:
+                ops[size - 1, 0] = 3
+            ops[size - 1, 2] = segments[s, 2]
+            ops[size - 1, 4] = segments[s, 4]
+        else:
+            for col in range(5):
+                ops[size, col] = segments[s, col]
+            size += 1
+    return ops[:size].copy(), True
+
+
+@functools.lru_cache(maxsize=None)
+def _load_myers_jit():
+    """Import numpy and Numba and compile the Myers kernel on first use.
+
+    Returns:
+        The compiled kernel, or None if numpy or Numba is not installed
+    """
+    global np
+    try:
+        import numpy
+        from numba import njit
+    except ImportError:  # Optional JIT compiler for the Myers kernel
+        return None
+    np = numpy
+    return njit(cache=True)(_myers_kernel)
+
+
+def _myers_opcodes(ids1: array, ids2: array) -> Optional[List[Tuple]]:
+    """Compute line opcodes with the Numba-compiled Myers kernel.
+
+    Args:
+        ids1: Line IDs from first file, as an array('i')
+        ids2: Line IDs from second file, as an array('i')
+
+    Returns:
+        List of difflib-style opcodes, or None if the files differ in more
+        than MYERS_MAX_EDITS lines
+    """
+    kernel = _load_myers_jit()
+    # Reinterpret the arrays' buffers in place rather than copying them
+    a = np.frombuffer(ids1, dtype=np.intc)
+    b = np.frombuffer(ids2, dtype=np.intc)
+    ops, found = kernel(a, b, min(len(a) + len(b), MYERS_MAX_EDITS))
+    if not found:
+        return None
+    return [(_MYERS_TAGS[tag], i1, i2, j1, j2) for tag, i1, i2, j1, j2 in ops.tolist()]
+
+
+def _dmp_opcodes(ids1: Sequence[int], ids2: Sequence[int]) -> Optional[List[Tuple]]:
+    """Compute line opcodes with diff-match-patch in line mode.
+
+    Args:
+        ids1: Line IDs from first file
+        ids2: Line IDs from second file
+
+    Returns:
+        List of difflib-style opcodes, or None if the line IDs could not be
+        encoded one character per line
+    """
+    try:
+        chars1 = ''.join(map(chr, ids1))
+        chars2 = ''.join(map(chr, ids2))
+    except ValueError:  # More distinct lines than Unicode code points
+        return None
+
+    dmp = diff_match_patch()
+    dmp.Diff_Timeout = 2.0
+
+    # Diff and clean up in the encoded space so every edit stays on line boundaries
+    diffs = dmp.diff_main(chars1, chars2, False)
+    dmp.diff_cleanupSemantic(diffs)
+
+    opcodes = []
+    i = j = 0
+    for op, text in diffs:
+        n = len(text)
+        if op == dmp.DIFF_EQUAL:
+            opcodes.append(('equal', i, i + n, j, j + n))
+            i += n
+            j += n
+            continue
+
+        if op == dmp.DIFF_DELETE:
+            tag, i2, j2 = 'delete', i + n, j
+        else:
+            tag, i2, j2 = 'insert', i, j + n
+
+        # Coalesce an adjacent delete/insert pair into a single replace
+        if opcodes and opcodes[-1][0] in ('delete', 'insert') and opcodes[-1][0] != tag:
+            _, i1, _, j1, _ = opcodes.pop()
+            opcodes.append(('replace', i1, i2, j1, j2))
+        else:
+            opcodes.append((tag, i, i2, j, j2))
+        i, j = i2, j2
+
+    return opcodes
+
+
+def _diff_slice(ids1: Sequence[int], ids2: Sequence[int]) -> List[Tuple]:
+    """Run the diff engine on two sequences of line IDs.
+
+    Prefers the Numba-compiled Myers kernel for IDs packed into arrays,
+    then diff-match-patch for small regions, and falls back to
+    SequenceMatcher (cdifflib's C version when available). Regions that
+    share no lines skip the engines.
+
+    Args:
+        ids1: Line IDs from first file
+        ids2: Line IDs from second file
+
+    Returns:
+        List of diff opcodes
+    """
+    if not (ids1 and ids2):
+        # At most one side has lines, so there is nothing to match
+        if ids1:
+            return [('delete', 0, len(ids1), 0, 0)]
+        return [('insert', 0, 0, 0, len(ids2))] if ids2 else []
+    if set(ids1).isdisjoint(ids2):
+        # No line occurs in both, so the whole region is one replace
+        return [('replace', 0, len(ids1), 0, len(ids2))]
+
+    if isinstance(ids1, array):
+        # Every line left unmatched costs an edit, so the multiset overlap
+        # bounds the edit distance; skip the kernel when it must give up
+        common = sum((Counter(ids1) & Counter(ids2)).values())
+        if len(ids1) + len(ids2) - 2 * common <= MYERS_MAX_EDITS:
+            opcodes = _myers_opcodes(ids1, ids2)
+            if opcodes is not None:
+                return opcodes
+
+    if diff_match_patch is not None and len(ids1) + len(ids2) <= DMP_MAX_LINES:
+        opcodes = _dmp_opcodes(ids1, ids2)
+        if opcodes is not None:
+            return opcodes
+
+    matcher = _SequenceMatcher(None, ids1, ids2)
+    return matcher.get_opcodes()
+
+
+def _patience_anchors(ids1: Sequence[int], ids2: Sequence[int]) -> List[Tuple[int, int]]:
+    """Find anchor lines for splitting a diff, as in patience diff.
+
+    Args:
+        ids1: Line IDs from first file
+        ids2: Line IDs from second file
+
+    Returns:
+        Longest list of (i, j) positions of lines that occur exactly once
+        in each file, increasing in both files
+    """
+    counts1 = Counter(ids1)
+    counts2 = Counter(ids2)
+    positions2 = {line: j for j, line in enumerate(ids2) if counts2[line] == 1}
+    candidates = [(i, positions2[line]) for i, line in enumerate(ids1)
+                  if counts1[line] == 1 and line in positions2]
+
+    # Longest increasing subsequence of j by patience sorting
+    tails: List[int] = []
+    tail_js: List[int] = []
+    previous = [-1] * len(candidates)
+    for c, (_, j) in enumerate(candidates):
+        pile = bisect.bisect_left(tail_js, j)
+        if pile:
+            previous[c] = tails[pile - 1]
+        if pile == len(tails):
+            tails.append(c)
+            tail_js.append(j)
+        else:
+            tails[pile] = c
+            tail_js[pile] = j
+
+    anchors = []
+    c = tails[-1] if tails else -1
+    while c >= 0:
+        anchors.append(candidates[c])
+        c = previous[c]
+    anchors.reverse()
+    return anchors
+
+
+def _append_opcode(opcodes: List[Tuple], opcode: Tuple) -> None:
+    """Append an opcode, merging it into a preceding equal run.
+
+    Args:
+        opcodes: Opcodes collected so far
+        opcode: Opcode to append
+    """
+    if opcode[0] == 'equal' and opcodes and opcodes[-1][0] == 'equal':
+        _, i1, _, j1, _ = opcodes.pop()
+        opcode = ('equal', i1, opcode[2], j1, opcode[4])
+    opcodes.append(opcode)
+
+
+def _parallel_opcodes(ids1: Sequence[int], ids2: Sequence[int]) -> Optional[List[Tuple]]:
+    """Diff the regions between anchor lines, in a process pool if large.
+
+    Args:
+        ids1: Line IDs from first file
+        ids2: Line IDs from second file
+
+    Returns:
+        List of diff opcodes, or None if there are no anchor lines to
+        split the diff at
+    """
+    anchors = _patience_anchors(ids1, ids2)
+    if not anchors:
+        return None
+
+    # Region k lies between anchor k - 1 and anchor k; the last one ends
+    # at the end of both files
+    starts = [(0, 0)] + [(i + 1, j + 1) for i, j in anchors]
+    ends = anchors + [(len(ids1), len(ids2))]
+    slices1 = [ids1[i1:i2] for (i1, _), (i2, _) in zip(starts, ends)]
+    slices2 = [ids2[j1:j2] for (_, j1), (_, j2) in zip(starts, ends)]
+
+    # Only regions with lines on both sides need a real diff; the others
+    # are a single delete or insert
+    jobs = []
+    results: List[List[Tuple]] = []
+    for k, (a, b) in enumerate(zip(slices1, slices2)):
+        if a and b:
+            jobs.append(k)
+            results.append([])
+        elif a:
+            results.append([('delete', 0, len(a), 0, 0)])
+        elif b:
+            results.append([('insert', 0, 0, 0, len(b))])
+        else:
+            results.append([])
+
+    args1 = [slices1[k] for k in jobs]
+    args2 = [slices2[k] for k in jobs]
+    workers = min(os.cpu_count() or 1, len(jobs))
+    sizes = [len(a) + len(b) for a, b in zip(args1, args2)]
+    diffs = None
+    if workers > 1 and sum(sizes) - max(sizes) > PARALLEL_MIN_LINES:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunksize = max(1, len(jobs) // (workers * 4))
+                diffs = list(executor.map(_diff_slice, args1, args2, chunksize=chunksize))
+        except (OSError, BrokenProcessPool):
+            pass
+    if diffs is None:
+        diffs = list(map(_diff_slice, args1, args2))
+    for k, diff in zip(jobs, diffs):
+        results[k] = diff
+
+    opcodes: List[Tuple] = []
+    for (i0, j0), (i_end, j_end), diff in zip(starts, ends, results):
+        for tag, i1, i2, j1, j2 in diff:
+            _append_opcode(opcodes, (tag, i1 + i0, i2 + i0, j1 + j0, j2 + j0))
+        if i_end < len(ids1):
+            _append_opcode(opcodes, ('equal', i_end, i_end + 1, j_end, j_end + 1))
+    return opcodes
+
+
+def _get_opcodes(lines1: List[str], lines2: List[str]) -> List[Tuple]:
+    """Get diff operations between two sets of lines.
+
+    The common leading and trailing lines are matched directly, so the
+    diff engine only sees the region where the files actually differ.
+    Large regions are split further at unique lines, and pieces that are
+    large too are diffed in parallel.
+
+    Args:
+        lines1: Lines from first file
+        lines2: Lines from second file
+
+    Returns:
+        List of diff opcodes
+    """
+    len1, len2 = len(lines1), len(lines2)
+    limit = min(len1, len2)
+
+    prefix = 0
+    while prefix < limit and lines1[prefix] == lines2[prefix]:
+        prefix += 1
+
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and lines1[len1 - 1 - suffix] == lines2[len2 - 1 - suffix]:
+        suffix += 1
+
+    # Number each distinct line so the engine hashes and compares small ints
+    line_ids = {}
+    ids1 = [line_ids.setdefault(line, len(line_ids)) for line in lines1[prefix:len1 - suffix]]
+    ids2 = [line_ids.setdefault(line, len(line_ids)) for line in lines2[prefix:len2 - suffix]]
+    if len(ids1) + len(ids2) >= MYERS_MIN_LINES and _load_myers_jit() is not None:
+        # The Myers kernel reads packed C ints; the other engines hash the
+        # IDs and are better served by the list's ready-made int objects
+        ids1 = array('i', ids1)
+        ids2 = array('i', ids2)
+
+    middle = None
+    if len(ids1) + len(ids2) > PARALLEL_MIN_LINES:
+        middle = _parallel_opcodes(ids1, ids2)
+    if middle is None:
+        middle = _diff_slice(ids1, ids2)
+
+    opcodes = [('equal', 0, prefix, 0, prefix)] if prefix else []
+    for tag, i1, i2, j1, j2 in middle:
+        opcodes.append((tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix))
+    if suffix:
+        opcodes.append(('equal', len1 - suffix, len1, len2 - suffix, len2))
+    return opcodes
+
+
+def _split_lines(text: str) -> List[str]:
+    """Split decoded text into lines, translating newlines like text mode.
+
+    Unlike str.splitlines, only LF, CRLF and CR end a line; form feeds and
+    the other Unicode line separators stay part of the line.
+
+    Args:
+        text: Decoded file content
+
+    Returns:
+        List of lines without their line terminators
+    """
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()  # Text ends with a newline, or is empty
+    return lines
+
+
+def _ends_with_newline(file_path: Path) -> bool:
+    """Check whether a file's last line ends with a line terminator.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        True if the file is empty or ends with LF or CR, False otherwise
+    """
+    with open(file_path, 'rb') as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) in (b'\n', b'\r')
+
+
+def _same_lines_opcodes(count: int, same_ending: bool) -> List[Tuple]:
+    """Get diff operations for two files that read to the same lines.
+
+    Args:
+        count: Number of lines in each file
+        same_ending: False if only one of the files ends its last line
+            with a newline
+
+    Returns:
+        List of diff opcodes: one equal block, with the last line split off
+        as replaced if only one file ends it with a newline
+    """
+    if same_ending or not count:
+        return [('equal', 0, count, 0, count)] if count else []
+    opcodes = [('equal', 0, count - 1, 0, count - 1)] if count > 1 else []
+    opcodes.append(('replace', count - 1, count, count - 1, count))
+    return opcodes
+
+
+def _file_opcodes(file1_path: Path, file2_path: Path, lines1: List[str],
+                  lines2: List[str], identical: bool, get_diff_opcodes) -> List[Tuple]:
+    """Get diff operations between two files that have been read.
+
+    Lines are compared without their terminators, except that a last line
+    without one only matches another such line, as when lines were
+    compared with their terminators.
+
+    Args:
+        file1_path: Path to the first file
+        file2_path: Path to the second file
+        lines1: Lines from first file
+        lines2: Lines from second file
+        identical: True if the files are byte-identical
+        get_diff_opcodes: Function computing opcodes between two line lists
+
+    Returns:
+        List of diff opcodes
+    """
+    if identical:
+        return _same_lines_opcodes(len(lines1), True)
+
+    ending1 = _ends_with_newline(file1_path)
+    ending2 = _ends_with_newline(file2_path)
+    if lines1 == lines2:
+        # Same lines, differing at most in line endings: no diff needed
+        return _same_lines_opcodes(len(lines1), ending1 == ending2)
+
+    # Mark an unterminated last line so it can only match the other file's
+    # unterminated last line; no line read from a file contains a newline
+    if not ending1:
+        lines1 = lines1[:-1] + [lines1[-1] + '\n']
+    if not ending2:
+        lines2 = lines2[:-1] + [lines2[-1] + '\n']
+    return get_diff_opcodes(lines1, lines2)
+
+
+def _read_lines(file_path: Path) -> List[str]:
+    """Read a UTF-8 file and split it into lines.
+
+    Small files are read with plain os.read calls on the descriptor;
+    larger ones are memory mapped and decoded in chunks.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        List of lines without their line terminators
+    """
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size <= LARGE_FILE_SIZE:
+            # Read until EOF in case the file grew or a read came back short
+            chunks = []
+            while True:
+                chunk = os.read(fd, max(size, DECODE_CHUNK_SIZE))
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return _split_lines(b''.join(chunks).decode('utf-8'))
+
+        with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mm:
+            # Decode newline-aligned chunks so the full decoded text never
+            # has to be held in memory next to the list of lines
+            lines: List[str] = []
+            start = 0
+            while start < size:
+                end = mm.find(b'\n', min(start + DECODE_CHUNK_SIZE, size) - 1)
+                end = size if end == -1 else end + 1
+                lines.extend(_split_lines(str(mm[start:end], 'utf-8')))
+                start = end
+            return lines
+    finally:
+        os.close(fd)
 
 
 class FileDiffGUI:
@@ -33,6 +630,18 @@ class FileDiffGUI:
             'bg_normal': 'white'
         }
 
+        # Every row of the current diff, per pane; only the rows in
+        # self._window (first, end) are inserted into the text widgets
+        self._left_rows: List[str] = []
+        self._left_tags: List[str] = []
+        self._right_rows: List[str] = []
+        self._right_tags: List[str] = []
+        self._window = (0, 0)
+
+        # (opcodes, lines1, lines2) of recent comparisons, keyed on each
+        # file's path, mtime and size; oldest entries come first
+        self._opcode_cache: dict = {}
+
         self.setup_ui()
 
     def setup_ui(self) -> None:
@@ -105,7 +714,7 @@ class FileDiffGUI:
             width=60,
             height=30
         )
-        self.left_text.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(0, 5))
+        self.left_text.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(GUTTER_WIDTH, 5))
 
         self.right_text = tk.Text(
             main_frame,
@@ -114,14 +723,38 @@ class FileDiffGUI:
             width=60,
             height=30
         )
-        self.right_text.grid(row=2, column=1, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(5, 0))
+        self.right_text.grid(row=2, column=1, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(5 + GUTTER_WIDTH, 0))
+
+        # Gutters: line colors are painted into one image per pane instead of
+        # tagging every row range, so Tk blits a single image while scrolling
+        self._line_height = tkfont.Font(root=self.root, font=('Courier', 10)).metrics('linespace')
+        inset = sum(int(str(self.left_text.cget(option)))
+                    for option in ('borderwidth', 'highlightthickness', 'pady'))
+
+        self.left_gutter = tk.Canvas(
+            main_frame,
+            width=GUTTER_WIDTH,
+            background=self.colors['bg_normal'],
+            borderwidth=0,
+            highlightthickness=0
+        )
+        self.left_gutter.grid(row=2, column=0, sticky=(tk.W, tk.N, tk.S), pady=inset)
+
+        self.right_gutter = tk.Canvas(
+            main_frame,
+            width=GUTTER_WIDTH,
+            background=self.colors['bg_normal'],
+            borderwidth=0,
+            highlightthickness=0
+        )
+        self.right_gutter.grid(row=2, column=1, sticky=(tk.W, tk.N, tk.S), padx=(5, 0), pady=inset)
 
         # Scrollbars
-        left_scroll = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.left_text.yview)
+        left_scroll = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self._on_yview)
         left_scroll.grid(row=2, column=0, sticky=(tk.E, tk.N, tk.S), padx=(0, 5))
         self.left_text.configure(yscrollcommand=left_scroll.set)
 
-        right_scroll = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.right_text.yview)
+        right_scroll = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self._on_yview)
         right_scroll.grid(row=2, column=1, sticky=(tk.E, tk.N, tk.S), padx=(5, 0))
         self.right_text.configure(yscrollcommand=right_scroll.set)
 
@@ -158,11 +791,6 @@ class FileDiffGUI:
             item_frame.pack(side=tk.LEFT, padx=5)
             tk.Label(item_frame, text=f" {label} ", background=color, font=('Courier', 9)).pack()
 
-        # Configure text tags for colors
-        for tag, color in self.colors.items():
-            self.left_text.tag_configure(tag, background=color)
-            self.right_text.tag_configure(tag, background=color)
-
     def browse_file1(self) -> None:
         """Open file dialog to select first file."""
         filename = filedialog.askopenfilename(
@@ -203,19 +831,115 @@ class FileDiffGUI:
         self.right_header.config(text=str(self.file2_path))
 
         # Clear previous content
-        self.left_text.config(state=tk.NORMAL)
-        self.right_text.config(state=tk.NORMAL)
-        self.left_text.delete(1.0, tk.END)
-        self.right_text.delete(1.0, tk.END)
+        self._left_rows, self._left_tags = [], []
+        self._right_rows, self._right_tags = [], []
+        self._render_window(0)
 
         # Perform comparison
         self.display_diff()
 
+    def _render_window(self, first: int) -> None:
+        """Insert one window of diff rows into both text widgets.
+
+        Args:
+            first: Index of the first row to render (clamped to the diff)
+        """
+        total = len(self._left_rows)
+        first = max(0, min(first, total - RENDER_WINDOW_ROWS))
+        end = min(total, first + RENDER_WINDOW_ROWS)
+        self._window = (first, end)
+
+        panes = (
+            (self.left_text, self.left_gutter, self._left_rows, self._left_tags),
+            (self.right_text, self.right_gutter, self._right_rows, self._right_tags),
+        )
+        for text_widget, gutter, rows, tags in panes:
+            # Unhook the scroll callback so the edits below do not update
+            # the scrollbars and gutters until the window is complete
+            yscrollcommand = text_widget.cget('yscrollcommand')
+            text_widget.configure(state=tk.NORMAL, yscrollcommand='')
+            text_widget.delete(1.0, tk.END)
+            if end > first:
+                # Join with a trailing empty row rather than appending '\n'
+                # afterwards, which would copy the whole window text again
+                window = rows[first:end]
+                window.append('')
+                text_widget.insert(tk.END, '\n'.join(window))
+            text_widget.configure(state=tk.DISABLED, yscrollcommand=yscrollcommand)
+            self._paint_gutter(gutter, tags[first:end])
+
+    def _paint_gutter(self, gutter: tk.Canvas, tags: List[str]) -> None:
+        """Paint the line colors of the rendered rows into a gutter canvas.
+
+        Args:
+            gutter: Canvas beside the text widget
+            tags: Line type of each rendered row
+        """
+        # The text widget shows an extra empty line after the last row
+        height = (len(tags) + 1) * self._line_height
+        image = tk.PhotoImage(width=GUTTER_WIDTH, height=height)
+        y = 0
+        for tag, run in itertools.groupby(tags):
+            y_end = y + sum(1 for _ in run) * self._line_height
+            image.put(self.colors[tag], to=(0, y, GUTTER_WIDTH, y_end))
+            y = y_end
+
+        gutter.delete('all')
+        gutter.create_image(0, 0, anchor=tk.NW, image=image)
+        gutter.configure(scrollregion=(0, 0, GUTTER_WIDTH, height))
+        gutter.image = image  # Tk does not keep a reference to the image
+
+    def _scroll_to_row(self, row: int) -> None:
+        """Scroll both text widgets so a diff row is at the top.
+
+        Args:
+            row: Index of the row in the whole diff
+        """
+        first, end = self._window
+        total = len(self._left_rows)
+        near_top = row < first + RENDER_MARGIN_ROWS and first > 0
+        near_end = row > end - 2 * RENDER_MARGIN_ROWS and end < total
+        if near_top or near_end:
+            self._render_window(row - RENDER_WINDOW_ROWS // 2)
+            first, end = self._window
+
+        # The widget shows an extra empty line after the last row
+        fraction = (row - first) / (end - first + 1)
+        self.left_text.yview_moveto(fraction)
+        self.right_text.yview_moveto(fraction)
+
+    def _on_yview(self, *args) -> None:
+        """Handle vertical scrollbar commands in terms of the whole diff."""
+        first, end = self._window
+        total = len(self._left_rows)
+        if args[0] == tk.MOVETO and end - first < total:
+            self._scroll_to_row(int(float(args[1]) * total))
+        else:
+            self.left_text.yview(*args)
+            self.right_text.yview(*args)
+
     def _on_scroll(self, scrollbar1: ttk.Scrollbar, scrollbar2: ttk.Scrollbar, *args) -> None:
         """Synchronize scrolling between two text widgets."""
-        scrollbar1.set(*args)
+        first, end = self._window
+        total = len(self._left_rows)
+        if end - first < total:
+            # Only part of the diff is rendered: map the view back to the
+            # whole diff and move the window before the view reaches its edge
+            span = end - first + 1
+            first_row = first + float(args[0]) * span
+            last_row = first + float(args[1]) * span
+            if ((first_row < first + RENDER_MARGIN_ROWS and first > 0) or
+                    (last_row > end - RENDER_MARGIN_ROWS and end < total)):
+                self._render_window(int(first_row) - RENDER_WINDOW_ROWS // 2)
+                self._scroll_to_row(int(first_row))
+                return
+            scrollbar1.set(first_row / total, min(last_row / total, 1.0))
+        else:
+            scrollbar1.set(*args)
         self.left_text.yview_moveto(args[0])
         self.right_text.yview_moveto(args[0])
+        self.left_gutter.yview_moveto(args[0])
+        self.right_gutter.yview_moveto(args[0])
 
     def _on_hscroll(self, scrollbar1: ttk.Scrollbar, scrollbar2: ttk.Scrollbar, *args) -> None:
         """Synchronize horizontal scrolling between two text widgets."""
@@ -237,8 +961,7 @@ class FileDiffGUI:
             UnicodeDecodeError: If file encoding is not UTF-8
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.readlines()
+            return _read_lines(file_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
         except UnicodeDecodeError:
@@ -247,6 +970,18 @@ class FileDiffGUI:
                 f"Cannot decode {file_path} as UTF-8. Binary file?"
             )
 
+    def files_identical(self) -> bool:
+        """Check whether both files have byte-identical content.
+
+        Returns:
+            True if the files match byte for byte, False otherwise or if
+            either file cannot be accessed
+        """
+        try:
+            return filecmp.cmp(self.file1_path, self.file2_path, shallow=False)
+        except OSError:
+            return False
+
     def get_diff_opcodes(self, lines1: List[str], lines2: List[str]) -> List[Tuple]:
         """Get diff operations between two sets of lines.
 
@@ -257,8 +992,44 @@ class FileDiffGUI:
         Returns:
             List of diff opcodes
         """
-        matcher = difflib.SequenceMatcher(None, lines1, lines2)
-        return matcher.get_opcodes()
+        return _get_opcodes(lines1, lines2)
+
+    def diff_files(self) -> Tuple[List[Tuple], List[str], List[str]]:
+        """Read and diff both files, reusing the result for unchanged files.
+
+        Returns:
+            Tuple of (opcodes, lines1, lines2)
+
+        Raises:
+            FileNotFoundError: If either file doesn't exist
+            UnicodeDecodeError: If either file is not UTF-8
+        """
+        try:
+            stat1 = self.file1_path.stat()
+            stat2 = self.file2_path.stat()
+            key = (str(self.file1_path), stat1.st_mtime_ns, stat1.st_size,
+                   str(self.file2_path), stat2.st_mtime_ns, stat2.st_size)
+        except OSError:
+            key = None  # Not cached; read_file reports the error
+
+        if key in self._opcode_cache:
+            # Move the hit to the end so it is evicted last
+            result = self._opcode_cache.pop(key)
+            self._opcode_cache[key] = result
+            return result
+
+        lines1 = self.read_file(self.file1_path)
+        identical = self.files_identical()
+        lines2 = lines1 if identical else self.read_file(self.file2_path)
+        opcodes = _file_opcodes(self.file1_path, self.file2_path, lines1, lines2,
+                                identical, self.get_diff_opcodes)
+
+        result = (opcodes, lines1, lines2)
+        if key is not None:
+            self._opcode_cache[key] = result
+            if len(self._opcode_cache) > OPCODE_CACHE_SIZE:
+                del self._opcode_cache[next(iter(self._opcode_cache))]
+        return result
 
     def display_diff(self) -> int:
         """Display the side-by-side diff in GUI.
@@ -267,72 +1038,63 @@ class FileDiffGUI:
             0 if files are identical, 1 if different, 2 if error
         """
         try:
-            lines1 = self.read_file(self.file1_path)
-            lines2 = self.read_file(self.file2_path)
+            opcodes, lines1, lines2 = self.diff_files()
         except (FileNotFoundError, UnicodeDecodeError) as e:
             messagebox.showerror("Error", str(e))
             return 2
 
-        opcodes = self.get_diff_opcodes(lines1, lines2)
         has_differences = False
 
-        left_line_num = 1
-        right_line_num = 1
+        # Build every row up front; _render_window hands Tk only the rows
+        # around the current view
+        left_rows: List[str] = []
+        right_rows: List[str] = []
+        left_tags: List[str] = []
+        right_tags: List[str] = []
 
         for tag, i1, i2, j1, j2 in opcodes:
             if tag == 'equal':
                 # Lines are the same
-                for i, j in zip(range(i1, i2), range(j1, j2)):
-                    line_left = lines1[i].rstrip('\n\r')
-                    line_right = lines2[j].rstrip('\n\r')
-
-                    self.left_text.insert(tk.END, line_left + '\n', 'equal')
-                    self.right_text.insert(tk.END, line_right + '\n', 'equal')
-
-                    left_line_num += 1
-                    right_line_num += 1
+                left_rows.extend(lines1[i1:i2])
+                right_rows.extend(lines2[j1:j2])
+                left_tags.extend(['equal'] * (i2 - i1))
+                right_tags.extend(['equal'] * (j2 - j1))
 
             elif tag == 'replace':
                 # Lines are different
                 has_differences = True
                 max_lines = max(i2 - i1, j2 - j1)
 
-                for k in range(max_lines):
-                    if i1 + k < i2:
-                        line_left = lines1[i1 + k].rstrip('\n\r')
-                        self.left_text.insert(tk.END, line_left + '\n', 'replace')
-                        left_line_num += 1
-                    else:
-                        self.left_text.insert(tk.END, '\n', 'bg_normal')
-
-                    if j1 + k < j2:
-                        line_right = lines2[j1 + k].rstrip('\n\r')
-                        self.right_text.insert(tk.END, line_right + '\n', 'replace')
-                        right_line_num += 1
-                    else:
-                        self.right_text.insert(tk.END, '\n', 'bg_normal')
+                left_rows.extend(lines1[i1:i2])
+                left_rows.extend([''] * (max_lines - (i2 - i1)))
+                left_tags.extend(['replace'] * (i2 - i1))
+                left_tags.extend(['bg_normal'] * (max_lines - (i2 - i1)))
+
+                right_rows.extend(lines2[j1:j2])
+                right_rows.extend([''] * (max_lines - (j2 - j1)))
+                right_tags.extend(['replace'] * (j2 - j1))
+                right_tags.extend(['bg_normal'] * (max_lines - (j2 - j1)))
 
             elif tag == 'delete':
                 # Lines only in file1
                 has_differences = True
-                for i in range(i1, i2):
-                    line = lines1[i].rstrip('\n\r')
-                    self.left_text.insert(tk.END, line + '\n', 'delete')
-                    self.right_text.insert(tk.END, '\n', 'bg_normal')
-                    left_line_num += 1
+                left_rows.extend(lines1[i1:i2])
+                left_tags.extend(['delete'] * (i2 - i1))
+                right_rows.extend([''] * (i2 - i1))
+                right_tags.extend(['bg_normal'] * (i2 - i1))
 
             elif tag == 'insert':
                 # Lines only in file2
                 has_differences = True
-                for j in range(j1, j2):
-                    line = lines2[j].rstrip('\n\r')
-                    self.left_text.insert(tk.END, '\n', 'bg_normal')
-                    self.right_text.insert(tk.END, line + '\n', 'insert')
-                    right_line_num += 1
+                left_rows.extend([''] * (j2 - j1))
+                left_tags.extend(['bg_normal'] * (j2 - j1))
+                right_rows.extend(lines2[j1:j2])
+                right_tags.extend(['insert'] * (j2 - j1))
 
-        # Make text widgets read-only
-        self.left_text.configure(state=tk.DISABLED)
-        self.right_text.configure(state=tk.DISABLED)
+        self._left_rows, self._left_tags = left_rows, left_tags
+        self._right_rows, self._right_tags = right_rows, right_tags
+        self._render_window(0)
+        self.root.update_idletasks()
 
         # Show result in title
         if has_differences:
@@ -373,6 +1135,8 @@ class FileDiffViewer:
         self.file2_path = Path(file2_path)
         self.width = width
         self.col_width = (width - 5) // 2  # 5 chars for separator and status
+        # "{:<w.w}" pads and cuts each column to col_width in one format call
+        self._row_format = f"{{:<{self.col_width}.{self.col_width}}} {{}} {{:<{self.col_width}.{self.col_width}}}\n"
 
     def read_file(self, file_path: Path) -> List[str]:
         """Read file and return lines.
@@ -388,8 +1152,7 @@ class FileDiffViewer:
             UnicodeDecodeError: If file encoding is not UTF-8
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.readlines()
+            return _read_lines(file_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
         except UnicodeDecodeError:
@@ -408,11 +1171,22 @@ class FileDiffViewer:
         Returns:
             Truncated line with ellipsis if needed
         """
-        line = line.rstrip('\n\r')
         if len(line) > width:
             return line[:width-3] + '...'
         return line.ljust(width)
 
+    def files_identical(self) -> bool:
+        """Check whether both files have byte-identical content.
+
+        Returns:
+            True if the files match byte for byte, False otherwise or if
+            either file cannot be accessed
+        """
+        try:
+            return filecmp.cmp(self.file1_path, self.file2_path, shallow=False)
+        except OSError:
+            return False
+
     def get_diff_opcodes(self, lines1: List[str], lines2: List[str]) -> List[Tuple]:
         """Get diff operations between two sets of lines.
 
@@ -423,8 +1197,7 @@ class FileDiffViewer:
         Returns:
             List of diff opcodes
         """
-        matcher = difflib.SequenceMatcher(None, lines1, lines2)
-        return matcher.get_opcodes()
+        return _get_opcodes(lines1, lines2)
 
     def print_header(self) -> None:
         """Print the comparison header."""
@@ -434,64 +1207,90 @@ class FileDiffViewer:
         print(f"{left_header} | {right_header}")
         print("=" * self.width)
 
-    def print_side_by_side(self, left: Optional[str], right: Optional[str],
-                          status: str) -> None:
-        """Print a side-by-side comparison line.
+    def format_side_by_side(self, left: str, right: str, status: str) -> str:
+        """Format a side-by-side comparison line.
 
         Args:
-            left: Left side content (None if not present)
-            right: Right side content (None if not present)
+            left: Left side content
+            right: Right side content
             status: Status character (' ', '+', '-', '|')
-        """
-        left_text = self.truncate_line(left if left else '', self.col_width)
-        right_text = self.truncate_line(right if right else '', self.col_width)
-        print(f"{left_text} {status} {right_text}")
-
-    def display_diff(self) -> int:
-        """Display the side-by-side diff.
 
         Returns:
-            0 if files are identical, 1 if different, 2 if error
+            Formatted line including the trailing newline
         """
-        try:
-            lines1 = self.read_file(self.file1_path)
-            lines2 = self.read_file(self.file2_path)
-        except (FileNotFoundError, UnicodeDecodeError) as e:
-            print(f"Error: {e}", file=sys.stderr)
-            return 2
+        # Only overlong lines need the ellipsis; the format pads the rest
+        if len(left) > self.col_width:
+            left = self.truncate_line(left, self.col_width)
+        if len(right) > self.col_width:
+            right = self.truncate_line(right, self.col_width)
+        return self._row_format.format(left, status, right)
 
-        self.print_header()
+    def _iter_diff_lines(self, opcodes: List[Tuple], lines1: List[str],
+                         lines2: List[str]) -> Iterator[str]:
+        """Yield the formatted side-by-side rows of a diff.
 
-        opcodes = self.get_diff_opcodes(lines1, lines2)
-        has_differences = False
+        Args:
+            opcodes: Diff opcodes for lines1 and lines2
+            lines1: Lines from first file
+            lines2: Lines from second file
+
+        Yields:
+            Formatted rows including their trailing newlines
+        """
+        format_row = self.format_side_by_side
 
         for tag, i1, i2, j1, j2 in opcodes:
             if tag == 'equal':
                 # Lines are the same
-                for i, j in zip(range(i1, i2), range(j1, j2)):
-                    self.print_side_by_side(lines1[i], lines2[j], ' ')
+                for left, right in zip(lines1[i1:i2], lines2[j1:j2]):
+                    yield format_row(left, right, ' ')
 
             elif tag == 'replace':
                 # Lines are different
-                has_differences = True
                 max_lines = max(i2 - i1, j2 - j1)
                 for k in range(max_lines):
-                    left = lines1[i1 + k] if i1 + k < i2 else None
-                    right = lines2[j1 + k] if j1 + k < j2 else None
-                    self.print_side_by_side(left, right, '|')
+                    left = lines1[i1 + k] if i1 + k < i2 else ''
+                    right = lines2[j1 + k] if j1 + k < j2 else ''
+                    yield format_row(left, right, '|')
 
             elif tag == 'delete':
                 # Lines only in file1
-                has_differences = True
-                for i in range(i1, i2):
-                    self.print_side_by_side(lines1[i], None, '-')
+                for left in lines1[i1:i2]:
+                    yield format_row(left, '', '-')
 
             elif tag == 'insert':
                 # Lines only in file2
-                has_differences = True
-                for j in range(j1, j2):
-                    self.print_side_by_side(None, lines2[j], '+')
+                for right in lines2[j1:j2]:
+                    yield format_row('', right, '+')
+
+    def display_diff(self) -> int:
+        """Display the side-by-side diff.
+
+        Returns:
+            0 if files are identical, 1 if different, 2 if error
+        """
+        try:
+            lines1 = self.read_file(self.file1_path)
+            identical = self.files_identical()
+            lines2 = lines1 if identical else self.read_file(self.file2_path)
+        except (FileNotFoundError, UnicodeDecodeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+
+        self.print_header()
 
+        opcodes = _file_opcodes(self.file1_path, self.file2_path, lines1, lines2,
+                                identical, self.get_diff_opcodes)
+        has_differences = any(opcode[0] != 'equal' for opcode in opcodes)
+
+        # Join rows into large pieces: on a terminal stdout is line buffered
+        # and would flush once for every row written on its own
+        rows = self._iter_diff_lines(opcodes, lines1, lines2)
+        while True:
+            batch = ''.join(itertools.islice(rows, WRITE_BATCH_ROWS))
+            if not batch:
+                break
+            sys.stdout.write(batch)
         print("=" * self.width)
 
         if has_differences:
@@ -1,14 +1,18 @@
 """Unit tests for MyFileDiff tool."""
 
+import io
+import os
 import pytest
+import random
 import sys
 import tempfile
+from array import array
 from pathlib import Path
 
 # Add the MyFileDiff directory to the path
 sys.path.insert(0, str(Path(__file__).parent / "MyFileDiff"))
 
-from MyFileDiff import FileDiffViewer, main
+from MyFileDiff import FileDiffGUI, FileDiffViewer, main
 
 
 class TestFileDiffViewer:
@@ -23,9 +27,58 @@ class TestFileDiffViewer:
         lines = viewer.read_file(test_file)
 
         assert len(lines) == 3
-        assert lines[0] == "Line 1\n"
-        assert lines[1] == "Line 2\n"
-        assert lines[2] == "Line 3\n"
+        assert lines[0] == "Line 1"
+        assert lines[1] == "Line 2"
+        assert lines[2] == "Line 3"
+
+    def test_read_file_splits_all_newlines(self, tmp_path):
+        """Test that LF, CRLF and CR line endings are all stripped."""
+        test_file = tmp_path / "test.txt"
+        test_file.write_bytes(b"Line 1\r\nLine 2\rLine 3")
+
+        viewer = FileDiffViewer(str(test_file), str(test_file))
+        lines = viewer.read_file(test_file)
+
+        assert lines == ["Line 1", "Line 2", "Line 3"]
+
+    def test_read_file_keeps_other_separators(self, tmp_path, monkeypatch):
+        """Test that form feeds and U+0085 inside a line do not split it."""
+        import MyFileDiff
+
+        test_file = tmp_path / "test.txt"
+        test_file.write_bytes("a\x0cb\nc\u0085d\r\n".encode('utf-8'))
+
+        viewer = FileDiffViewer(str(test_file), str(test_file))
+        assert viewer.read_file(test_file) == ["a\x0cb", "c\u0085d"]
+
+        monkeypatch.setattr(MyFileDiff, "LARGE_FILE_SIZE", 4)
+        monkeypatch.setattr(MyFileDiff, "DECODE_CHUNK_SIZE", 3)
+        assert viewer.read_file(test_file) == ["a\x0cb", "c\u0085d"]
+
+    def test_read_file_empty(self, tmp_path):
+        """Test reading an empty file."""
+        test_file = tmp_path / "empty.txt"
+        test_file.write_bytes(b"")
+
+        viewer = FileDiffViewer(str(test_file), str(test_file))
+
+        assert viewer.read_file(test_file) == []
+
+    def test_read_file_large_chunked(self, tmp_path, monkeypatch):
+        """Test that chunked decoding of large files splits lines the same way."""
+        import MyFileDiff
+
+        test_file = tmp_path / "large.txt"
+        test_file.write_bytes("".join(f"Line {i} \u00e9\r\n" for i in range(200)).encode('utf-8'))
+
+        viewer = FileDiffViewer(str(test_file), str(test_file))
+        expected = viewer.read_file(test_file)
+
+        monkeypatch.setattr(MyFileDiff, "LARGE_FILE_SIZE", 16)
+        monkeypatch.setattr(MyFileDiff, "DECODE_CHUNK_SIZE", 37)
+
+        assert viewer.read_file(test_file) == expected
+        assert expected[199] == "Line 199 \u00e9"
 
     def test_read_file_not_found(self, tmp_path):
         """Test reading a non-existent file."""
@@ -52,6 +105,31 @@ class TestFileDiffViewer:
         assert len(result) == 20
         assert result.endswith("...")
 
+    def test_format_side_by_side(self):
+        """Test that each column is padded or truncated to the column width."""
+        viewer = FileDiffViewer("file1.txt", "file2.txt", width=25)
+        result = viewer.format_side_by_side("Short", "B" * 30, '|')
+
+        assert result == "Short      | BBBBBBB...\n"
+
+    def test_iter_diff_lines(self):
+        """Test that each opcode yields one formatted row per output line."""
+        viewer = FileDiffViewer("file1.txt", "file2.txt", width=25)
+        opcodes = [
+            ('equal', 0, 1, 0, 1),
+            ('replace', 1, 3, 1, 2),
+            ('insert', 3, 3, 2, 3),
+        ]
+
+        rows = list(viewer._iter_diff_lines(opcodes, ["a", "b", "c"], ["a", "x", "y"]))
+
+        assert rows == [
+            "a            a         \n",
+            "b          | x         \n",
+            "c          |           \n",
+            "           + y         \n",
+        ]
+
     def test_identical_files(self, tmp_path):
         """Test comparing two identical files."""
         file1 = tmp_path / "file1.txt"
@@ -66,6 +144,68 @@ class TestFileDiffViewer:
 
         assert result == 0  # Files are identical
 
+    def test_files_identical(self, tmp_path):
+        """Test the byte-for-byte identical file check."""
+        file1 = tmp_path / "file1.txt"
+        file2 = tmp_path / "file2.txt"
+        file3 = tmp_path / "file3.txt"
+
+        file1.write_text("Line 1\nLine 2\n", encoding='utf-8')
+        file2.write_text("Line 1\nLine 2\n", encoding='utf-8')
+        file3.write_text("Line 1\nLine X\n", encoding='utf-8')
+
+        assert FileDiffViewer(str(file1), str(file2)).files_identical()
+        assert not FileDiffViewer(str(file1), str(file3)).files_identical()
+        assert not FileDiffViewer(str(file1), str(tmp_path / "missing.txt")).files_identical()
+
+    def test_files_differing_only_in_line_endings(self, tmp_path, capsys):
+        """Test that CRLF and LF versions of a file compare as identical."""
+        file1 = tmp_path / "file1.txt"
+        file2 = tmp_path / "file2.txt"
+
+        file1.write_bytes(b"Line 1\r\nLine 2\r\n")
+        file2.write_bytes(b"Line 1\nLine 2\n")
+
+        viewer = FileDiffViewer(str(file1), str(file2))
+        result = viewer.display_diff()
+
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "Line 2" in captured.out
+        assert "Files are identical" in captured.out
+
+    def test_missing_final_newline_is_a_difference(self, tmp_path, capsys):
+        """Test that a missing final newline marks the last line as modified."""
+        file1 = tmp_path / "file1.txt"
+        file2 = tmp_path / "file2.txt"
+
+        file1.write_bytes(b"Line 1\nLine 2\n")
+        file2.write_bytes(b"Line 1\nLine 2")
+
+        viewer = FileDiffViewer(str(file1), str(file2), width=25)
+        result = viewer.display_diff()
+
+        assert result == 1
+        captured = capsys.readouterr()
+        assert "Line 1       Line 1" in captured.out
+        assert "Line 2     | Line 2" in captured.out
+
+    def test_missing_final_newline_in_changed_files(self, tmp_path, capsys):
+        """Test that a missing final newline still marks the last line when other lines differ too."""
+        file1 = tmp_path / "file1.txt"
+        file2 = tmp_path / "file2.txt"
+
+        file1.write_bytes(b"a\nb\nc\n")
+        file2.write_bytes(b"a\nX\nc")
+
+        viewer = FileDiffViewer(str(file1), str(file2), width=25)
+        result = viewer.display_diff()
+
+        assert result == 1
+        captured = capsys.readouterr()
+        assert "b          | X" in captured.out
+        assert "c          | c" in captured.out
+
     def test_different_files(self, tmp_path, capsys):
         """Test comparing two different files."""
         file1 = tmp_path / "file1.txt"
@@ -82,6 +222,34 @@ class TestFileDiffViewer:
         captured = capsys.readouterr()
         assert "Legend:" in captured.out
 
+    def test_display_diff_batches_writes(self, tmp_path, monkeypatch):
+        """Test that a line-buffered stdout is not flushed once per row."""
+        file1 = tmp_path / "file1.txt"
+        file2 = tmp_path / "file2.txt"
+
+        file1.write_text("".join(f"Line {i}\n" for i in range(3000)), encoding='utf-8')
+        file2.write_text("".join(f"Line {i}!\n" for i in range(3000)), encoding='utf-8')
+
+        class CountingRaw(io.RawIOBase):
+            writes = 0
+
+            def writable(self):
+                return True
+
+            def write(self, data):
+                self.writes += 1
+                return len(data)
+
+        raw = CountingRaw()
+        stdout = io.TextIOWrapper(io.BufferedWriter(raw), encoding='utf-8',
+                                  line_buffering=True)
+        monkeypatch.setattr(sys, 'stdout', stdout)
+
+        viewer = FileDiffViewer(str(file1), str(file2))
+        assert viewer.display_diff() == 1
+
+        assert raw.writes < 20
+
     def test_file_with_additions(self, tmp_path):
         """Test file with additional lines."""
         file1 = tmp_path / "file1.txt"
@@ -121,6 +289,335 @@ class TestFileDiffViewer:
 
         assert result == 0  # Both empty, so identical
 
+    def test_get_diff_opcodes_cover_both_files(self):
+        """Test that opcodes span both files and equal runs really match."""
+        lines1 = ["a\n", "b\n", "c\n", "d\n", "e\n"]
+        lines2 = ["a\n", "x\n", "c\n", "e\n", "f\n"]
+
+        viewer = FileDiffViewer("file1.txt", "file2.txt")
+        opcodes = viewer.get_diff_opcodes(lines1, lines2)
+
+        i = j = 0
+        for tag, i1, i2, j1, j2 in opcodes:
+            assert (i1, j1) == (i, j)
+            if tag == 'equal':
+                assert lines1[i1:i2] == lines2[j1:j2]
+            i, j = i2, j2
+        assert (i, j) == (len(lines1), len(lines2))
+
+    def test_get_diff_opcodes_strips_common_ends(self):
+        """Test that shared leading and trailing lines become equal opcodes."""
+        lines1 = ["a\n", "b\n", "c\n", "d\n"]
+        lines2 = ["a\n", "x\n", "y\n", "c\n", "d\n"]
+
+        viewer = FileDiffViewer("file1.txt", "file2.txt")
+        opcodes = viewer.get_diff_opcodes(lines1, lines2)
+
+        assert opcodes == [
+            ('equal', 0, 1, 0, 1),
+            ('replace', 1, 2, 1, 3),
+            ('equal', 2, 4, 3, 5),
+        ]
+
+    def test_get_diff_opcodes_parallel(self, monkeypatch):
+        """Test that splitting at anchor lines still yields valid opcodes."""
+        import MyFileDiff
+
+        monkeypatch.setattr(MyFileDiff, "PARALLEL_MIN_LINES", 0)
+        lines1 = [f"{i % 5}\n" for i in range(40)] + ["x\n", "y\n"]
+        lines2 = ["x\n"] + [f"{i % 3}\n" for i in range(40)] + ["y\n"]
+
+        viewer = FileDiffViewer("file1.txt", "file2.txt")
+        opcodes = viewer.get_diff_opcodes(lines1, lines2)
+
+        i = j = 0
+        for tag, i1, i2, j1, j2 in opcodes:
+            assert (i1, j1) == (i, j)
+            if tag == 'equal':
+                assert lines1[i1:i2] == lines2[j1:j2]
+            i, j = i2, j2
+        assert (i, j) == (len(lines1), len(lines2))
+        assert opcodes[-1] == ('equal', 41, 42, 41, 42)
+
+
+class TestDiffHelpers:
+    """Test cases for the module-level diff helpers."""
+
+    def test_patience_anchors(self):
+        """Test that anchors are unique lines kept in order in both files."""
+        from MyFileDiff import _patience_anchors
+
+        # 0 repeats in ids1 and 4 is missing from ids2, so neither anchors;
+        # 2 and 3 swap places, so only one of them can be kept
+        anchors = _patience_anchors([0, 1, 0, 2, 3, 4, 5], [1, 3, 2, 5, 0])
+
+        assert anchors == [(1, 0), (4, 1), (6, 3)]
+
+    def test_parallel_opcodes_small_regions_stay_serial(self, monkeypatch):
+        """Test that small regions skip the process pool and the diff engine."""
+        import MyFileDiff
+
+        def no_pool(*args, **kwargs):
+            raise AssertionError("process pool started")
+
+        monkeypatch.setattr(MyFileDiff, "ProcessPoolExecutor", no_pool)
+        monkeypatch.setattr(MyFileDiff.os, "cpu_count", lambda: 4)
+        diffed = []
+        original = MyFileDiff._diff_slice
+        monkeypatch.setattr(MyFileDiff, "_diff_slice",
+                            lambda a, b: diffed.append((a, b)) or original(a, b))
+
+        # Regions: [7] vs [], [8] vs [9], [] vs [6] around anchors 1 and 2
+        opcodes = MyFileDiff._parallel_opcodes([7, 1, 8, 2], [1, 9, 2, 6])
+
+        assert diffed == [([8], [9])]
+        assert opcodes == [
+            ('delete', 0, 1, 0, 0),
+            ('equal', 1, 2, 0, 1),
+            ('replace', 2, 3, 1, 2),
+            ('equal', 3, 4, 2, 3),
+            ('insert', 4, 4, 3, 4),
+        ]
+
+    def test_parallel_opcodes_pool_needs_spread_work(self, monkeypatch):
+        """Test that the pool starts only when work lies outside the largest piece."""
+        import MyFileDiff
+
+        pools = []
+
+        class SpyPool:
+            def __init__(self, max_workers):
+                self.max_workers = max_workers
+                self.items = 0
+                pools.append(self)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def map(self, fn, *iterables, chunksize=1):
+                results = list(map(fn, *iterables))
+                self.items += len(results)
+                return results
+
+        monkeypatch.setattr(MyFileDiff, "ProcessPoolExecutor", SpyPool)
+        monkeypatch.setattr(MyFileDiff.os, "cpu_count", lambda: 8)
+
+        # Pieces of 8, 2 and 2 lines around anchors 1 and 2
+        ids1 = [10, 11, 12, 13, 1, 20, 2, 30]
+        ids2 = [14, 15, 16, 17, 1, 21, 2, 31]
+
+        monkeypatch.setattr(MyFileDiff, "PARALLEL_MIN_LINES", 4)
+        serial = MyFileDiff._parallel_opcodes(ids1, ids2)
+        assert pools == []
+
+        monkeypatch.setattr(MyFileDiff, "PARALLEL_MIN_LINES", 3)
+        assert MyFileDiff._parallel_opcodes(ids1, ids2) == serial
+        assert [(pool.max_workers, pool.items) for pool in pools] == [(3, 3)]
+
+    def test_diff_slice_disjoint_region(self, monkeypatch):
+        """Test that a middle region sharing no lines is one replace without a diff engine."""
+        import MyFileDiff
+
+        def no_engine(*args):
+            raise AssertionError("diff engine used")
+
+        monkeypatch.setattr(MyFileDiff, "_myers_opcodes", no_engine)
+        monkeypatch.setattr(MyFileDiff, "_dmp_opcodes", no_engine)
+        monkeypatch.setattr(MyFileDiff, "_SequenceMatcher", no_engine)
+
+        opcodes = MyFileDiff._get_opcodes(["a", "x", "y", "b"], ["a", "p", "q", "r", "b"])
+
+        assert opcodes == [
+            ('equal', 0, 1, 0, 1),
+            ('replace', 1, 3, 1, 4),
+            ('equal', 3, 4, 4, 5),
+        ]
+
+    def test_dmp_opcodes_coalesce_replace(self):
+        """Test that diff-match-patch edits are translated to difflib opcodes."""
+        pytest.importorskip("diff_match_patch")
+        from MyFileDiff import _dmp_opcodes
+
+        opcodes = _dmp_opcodes([0, 1, 2], [0, 3, 2])
+
+        assert opcodes == [
+            ('equal', 0, 1, 0, 1),
+            ('replace', 1, 2, 1, 2),
+            ('equal', 2, 3, 2, 3),
+        ]
+
+    def test_myers_kernel_random(self, monkeypatch):
+        """Test the Myers kernel on random inputs against an exact LCS."""
+        np = pytest.importorskip("numpy")
+        import MyFileDiff
+        from MyFileDiff import _myers_kernel
+
+        monkeypatch.setattr(MyFileDiff, "np", np)
+
+        rng = random.Random(0)
+        for _ in range(300):
+            a = [rng.randrange(4) for _ in range(rng.randrange(13))]
+            b = [rng.randrange(4) for _ in range(rng.randrange(13))]
+
+            ops, found = _myers_kernel(np.array(a, dtype=np.int32),
+                                       np.array(b, dtype=np.int32), len(a) + len(b))
+            assert found
+
+            i = j = equal = 0
+            for tag, i1, i2, j1, j2 in ops.tolist():
+                assert (i1, j1) == (i, j)
+                if tag == 0:
+                    assert a[i1:i2] == b[j1:j2]
+                    equal += i2 - i1
+                elif tag == 1:
+                    assert i2 > i1 and j2 == j1
+                elif tag == 2:
+                    assert i2 == i1 and j2 > j1
+                else:
+                    assert i2 > i1 and j2 > j1
+                i, j = i2, j2
+            assert (i, j) == (len(a), len(b))
+
+            # Length of the longest common subsequence by dynamic programming
+            lcs = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+            for x in range(len(a)):
+                for y in range(len(b)):
+                    lcs[x + 1][y + 1] = (lcs[x][y] + 1 if a[x] == b[y]
+                                         else max(lcs[x][y + 1], lcs[x + 1][y]))
+            assert equal == lcs[len(a)][len(b)]
+
+    def test_small_regions_skip_numba(self, monkeypatch):
+        """Test that small regions never import Numba for the Myers kernel."""
+        import MyFileDiff
+
+        def no_numba():
+            raise AssertionError("Numba loaded")
+
+        monkeypatch.setattr(MyFileDiff, "_load_myers_jit", no_numba)
+
+        opcodes = MyFileDiff._get_opcodes(["a", "b", "c"], ["a", "x", "c"])
+
+        assert opcodes == [('equal', 0, 1, 0, 1), ('replace', 1, 2, 1, 2), ('equal', 2, 3, 2, 3)]
+
+    def test_diff_slice_skips_myers_beyond_max_edits(self, monkeypatch):
+        """Test that regions needing more than MYERS_MAX_EDITS edits skip the kernel."""
+        import MyFileDiff
+
+        def no_myers(*args):
+            raise AssertionError("Myers kernel used")
+
+        monkeypatch.setattr(MyFileDiff, "_myers_opcodes", no_myers)
+        monkeypatch.setattr(MyFileDiff, "MYERS_MAX_EDITS", 3)
+
+        # Only 0 and 3 can match, so at least 4 lines need an edit
+        opcodes = MyFileDiff._diff_slice(array('i', [0, 1, 2, 3]), array('i', [0, 4, 5, 3]))
+
+        assert opcodes == [('equal', 0, 1, 0, 1), ('replace', 1, 3, 1, 3), ('equal', 3, 4, 3, 4)]
+
+    def test_myers_opcodes(self):
+        """Test that the Numba Myers kernel yields minimal difflib-style opcodes."""
+        pytest.importorskip("numba")
+        from MyFileDiff import _myers_opcodes
+
+        opcodes = _myers_opcodes(array('i', [0, 1, 2, 3]), array('i', [0, 4, 2, 3, 5]))
+
+        assert opcodes == [
+            ('equal', 0, 1, 0, 1),
+            ('replace', 1, 2, 1, 2),
+            ('equal', 2, 4, 2, 4),
+            ('insert', 4, 4, 4, 5),
+        ]
+
+
+class TestDiffCache:
+    """Test cases for the GUI's cache of diff results."""
+
+    def make_gui(self, file1, file2):
+        """Create a FileDiffGUI without a window that records file reads."""
+        gui = FileDiffGUI.__new__(FileDiffGUI)
+        gui.file1_path = Path(file1)
+        gui.file2_path = Path(file2)
+        gui._opcode_cache = {}
+        gui.reads = []
+
+        def read_file(file_path):
+            gui.reads.append(file_path)
+            return FileDiffGUI.read_file(gui, file_path)
+
+        gui.read_file = read_file
+        return gui
+
+    def test_unchanged_files_hit_cache(self, tmp_path):
+        """Test that comparing unchanged files again skips reading them."""
+        file1 = tmp_path / "file1.txt"
+        file2 = tmp_path / "file2.txt"
+        file1.write_text("Line 1\nLine 2\n", encoding='utf-8')
+        file2.write_text("Line 1\nLine 3\n", encoding='utf-8')
+
+        gui = self.make_gui(file1, file2)
+        first = gui.diff_files()
+        second = gui.diff_files()
+
+        assert second is first
+        assert gui.reads == [file1, file2]
+        assert first[0] == [('equal', 0, 1, 0, 1), ('replace', 1, 2, 1, 2)]
+
+    def test_changed_files_invalidate_cache(self, tmp_path):
+        """Test that a new size or mtime makes the files be read again."""
+        file1 = tmp_path / "file1.txt"
+        file2 = tmp_path / "file2.txt"
+        file1.write_text("Line 1\n", encoding='utf-8')
+        file2.write_text("Line 2\n", encoding='utf-8')
+
+        gui = self.make_gui(file1, file2)
+        gui.diff_files()
+
+        file2.write_text("Line 22\n", encoding='utf-8')
+        assert gui.diff_files()[2] == ["Line 22"]
+        assert len(gui.reads) == 4
+
+        # Same size, different modification time
+        stat = file2.stat()
+        file2.write_text("Line 33\n", encoding='utf-8')
+        os.utime(file2, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert gui.diff_files()[2] == ["Line 33"]
+        assert len(gui.reads) == 6
+
+    def test_cache_evicts_least_recently_used(self, tmp_path, monkeypatch):
+        """Test that the cache drops the least recently used entry when full."""
+        import MyFileDiff
+
+        monkeypatch.setattr(MyFileDiff, "OPCODE_CACHE_SIZE", 2)
+        files = []
+        for name in "abc":
+            path = tmp_path / f"{name}.txt"
+            path.write_text(f"{name}\n", encoding='utf-8')
+            files.append(path)
+        base = tmp_path / "base.txt"
+        base.write_text("base\n", encoding='utf-8')
+
+        gui = self.make_gui(base, files[0])
+        for path in (files[0], files[1], files[0], files[2]):
+            gui.file2_path = path
+            gui.diff_files()
+
+        assert [key[3] for key in gui._opcode_cache] == [str(files[0]), str(files[2])]
+        assert len(gui.reads) == 6
+
+    def test_missing_file_bypasses_cache(self, tmp_path):
+        """Test that a file that cannot be stat'ed is reported and not cached."""
+        file1 = tmp_path / "file1.txt"
+        file1.write_text("Line 1\n", encoding='utf-8')
+
+        gui = self.make_gui(file1, tmp_path / "missing.txt")
+
+        with pytest.raises(FileNotFoundError, match="File not found"):
+            gui.diff_files()
+        assert gui._opcode_cache == {}
+
 
 class TestMainFunction:
     """Test cases for main function."""